@@ -19,8 +19,9 @@ class BFInterpreter:
         self.tape = [0]
         self.tape_pointer = 0
         self.code_pointer = -1
-        self.output = ''
+        self.output = []
         self.instruction_count = 0
+        self.input_count = 0
         self.past = deque(maxlen=maxlen)
         self.commands = {
             '[': self.open_loop,
@@ -34,35 +35,77 @@ class BFInterpreter:
         }
 
     def step(self):
-        if self.code_pointer + 1 >= len(self.code):
+        # This is the hot path of step_n, so attributes are looked up only once
+        code = self.code
+        commands = self.commands
+        code_pointer = self.code_pointer + 1
+        if code_pointer >= len(code):
             raise ExecutionEndedError
 
-        self.past.append((self.code_pointer, self.tape_pointer,
-                          self.tape[self.tape_pointer], len(self.output)))
-
-        self.code_pointer += 1
         try:
-            while self.current_instruction not in self.commands:
-                self.code_pointer += 1
+            while code[code_pointer] not in commands:
+                code_pointer += 1
         except IndexError:
-            self.code_pointer -= 1
-            self.past.pop()
+            self.code_pointer = code_pointer - 1
             raise ExecutionEndedError
 
-        code_pointer = self.code_pointer
+        self.past.append((self.code_pointer, self.tape_pointer,
+                          self.tape[self.tape_pointer], len(self.output),
+                          self.input_count))
+
+        self.code_pointer = code_pointer
         self.instruction_count += 1
 
-        self.commands[self.current_instruction]()
+        commands[code[code_pointer]]()
 
         return code_pointer
 
+    def step_n(self, steps, breakpoints=()):
+        """Step up to `steps` instructions. Stop early after an instruction whose
+        location is in `breakpoints` is executed, or if an `InterpreterError` is raised.
+
+        Return a tuple of the location of the last executed instruction (None if no
+        instruction was executed) and the error that stopped execution (None if none)."""
+        step = self.step
+        code_pointer = None
+        try:
+            if breakpoints:
+                for _ in range(steps):
+                    code_pointer = step()
+                    if code_pointer in breakpoints:
+                        break
+            else:
+                # Nothing to stop at, so don't check after every step
+                for _ in range(steps):
+                    code_pointer = step()
+        except InterpreterError as error:
+            return code_pointer, error
+        return code_pointer, None
+
+    def back_n(self, steps, breakpoints=()):
+        """Step up to `steps` instructions backwards. Stop early if the current
+        instruction location is in `breakpoints` or if an `InterpreterError` is raised.
+
+        Return a tuple of the current instruction location (None if nothing was
+        stepped back) and the error that stopped execution (None if none)."""
+        back = self.back
+        code_pointer = None
+        try:
+            for _ in range(steps):
+                code_pointer = back()
+                if code_pointer in breakpoints:
+                    break
+        except InterpreterError as error:
+            return code_pointer, error
+        return code_pointer, None
+
     def run(self):
         while True:
             try:
                 self.step()
             except ExecutionEndedError:
                 break
-        return self.output
+        return ''.join(self.output)
 
     def open_loop(self):
         if self.current_cell == 0:
@@ -95,23 +138,26 @@ class BFInterpreter:
         input_ = self.input_func()
         if input_:
             self.tape[self.tape_pointer] = ord(input_) % 256
+            self.input_count += 1
         else:
             self.back()  # Reset back to was it was before
             raise NoInputError
 
     def add_output(self):
-        self.output += chr(self.current_cell)
+        self.output.append(chr(self.current_cell))
         if self.output_func:
             self.output_func(self.output)
 
     def back(self):
         try:
-            self.code_pointer, self.tape_pointer, tape_val, output_len = self.past.pop()
+            (self.code_pointer, self.tape_pointer, tape_val,
+             output_len, self.input_count) = self.past.pop()
         except IndexError:
             raise NoPreviousExecutionError
         if output_len != len(self.output):
-            self.output = self.output[:-1]
-            self.output_func(self.output)
+            self.output.pop()
+            if self.output_func:
+                self.output_func(self.output)
         self.tape[self.tape_pointer] = tape_val
         self.instruction_count -= 1
         return self.code_pointer
@@ -1,7 +1,11 @@
+import itertools
+import operator
 import tkinter as tk
 from texts import TagText, InputText
 from utility_widgets import ResizeFrame, ScrollTextFrame, TextLineNumbers
 
+CELL_HEIGHT = 20
+
 
 class CodeFrame(ResizeFrame, ScrollTextFrame):
     """Frame where the user types their code."""
@@ -46,8 +50,8 @@ class CodeFrame(ResizeFrame, ScrollTextFrame):
                 # Insert 4 spaces at the start of every selected line
                 self.text.insert(f'{line}.0', '    ')
 
-            # Inserting breaks the selection so fix the selection
-            self.text.tag_remove('sel', '1.0')
+            # The inserted spaces aren't tagged, so extend the selection over them.
+            # Everything that was already selected lies within the new range
             self.text.tag_add('sel', f'{selected[0]}+4c', f'{selected[1]}+4c')
         return 'break'
 
@@ -64,10 +68,13 @@ class CodeFrame(ResizeFrame, ScrollTextFrame):
             # is the current line
             start = end = self.text.index_line('insert')
 
-        for line in range(start, end + 1):
-            index = self._search_spaces(line)
-            col = self.text.index_col(index)
-            self.text.delete(f'{line}.0', f'{line}.{min(col, 4)}')
+        # Read the whole block once and work out the leading spaces in Python,
+        # so that only the deletions themselves go through Tk
+        block = self.text.get(f'{start}.0', f'{end}.0 lineend')
+        for line, line_text in enumerate(block.split('\n'), start):
+            spaces = min(len(line_text) - len(line_text.lstrip(' ')), 4)
+            if spaces:
+                self.text.delete(f'{line}.0', f'{line}.{spaces}')
 
         # This method seems to work without having to replace the current selection.
         # However, if it breaks, remove and add the selected tag like in `self.add_tag`
@@ -125,89 +132,116 @@ class CodeFrame(ResizeFrame, ScrollTextFrame):
         """Searches for the first non-space character in `line` up to `end`. Search stops at
         last character in line if `end` is not given."""
         linestart = f'{line}.0'
-        lineend = self.text.index(end if end else f'{linestart} lineend')
-        index = self.text.search(
-            '[^ ]', linestart, stopindex=lineend, regexp=True) or lineend
-        return index
+        lineend = end if end else f'{linestart} lineend'
+        line_text = self.text.get(linestart, lineend)
+        spaces = len(line_text) - len(line_text.lstrip(' '))
+        return f'{line}.{spaces}'
 
 
 class TapeFrame(ResizeFrame):
-    """Frame where the tape and cells are displayed."""
+    """Frame where the tape and cells are displayed. The cells and headings are
+    drawn as items on canvases rather than being widgets of their own."""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.cells = []
+        self.create_canvases()
+
+        # Canvas item ids of each cell, along with the value each one displays
+        self.cell_rects = []
+        self.cell_texts = []
+        self.cell_values = []
         self.row_headings = []
-        self.column_headings = []
+        # Total number of cells
+        self.tape_length = 0
 
-        self.create_frame()
-        self.create_zero_heading()
+        self.last_tape_length = 0
+        self.last_rows = 0
+        self.last_columns = 0
+        self.last_width = 0
+        # Index of the highlighted cell, or None if no cell is highlighted
+        self.last_cell_ind = None
+        # Whether nothing has been changed since the last reset
+        self.is_reset = False
 
-        self.bind('<Configure>', lambda e: (self.update_idletasks(), self.resize_canvas()))
+        self.init_tape_after = None
+        self.scroll_pending = False
+        self.bind('<Configure>', lambda e: self.schedule_init_tape())
 
         self.reset()
 
-    def create_frame(self):
-
-        self.column_heading_frame = tk.Frame(self)
-        self.column_heading_frame.grid(row=0, column=0, sticky='nesw')
-
+    def create_canvases(self):
+        self.heading_canvas = tk.Canvas(
+            self, height=CELL_HEIGHT, highlightthickness=0)
         self.canvas = tk.Canvas(self, highlightthickness=0)
-        self.frame = tk.Frame(self.canvas)
         self.vsb = tk.Scrollbar(self, orient="vertical",
                                 command=self.canvas.yview)
         self.canvas.configure(yscrollcommand=self.vsb.set)
 
+        self.heading_canvas.grid(row=0, column=0, sticky='nesw')
         self.canvas.grid(row=1, column=0, sticky='nesw')
         self.vsb.grid(row=1, column=1, sticky='nesw')
-        self.canvas_frame = self.canvas.create_window(
-            0, 0, window=self.frame, anchor='nw')
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        self.frame.columnconfigure(0, weight=1)
+    def reset(self):
+        """Go back to a tape of 20 cells containing 0. The first 20 cells are kept
+        and cleared rather than being drawn again."""
+        # The tape may have been scrolled since the last reset, so always go back to the top
+        self.canvas.yview_moveto(0)
+        if self.is_reset:
+            return
+        self.is_reset = True
+
+        itemconfigure = self.canvas.itemconfigure
 
-    def create_zero_heading(self):
-        """Create the empty cell at the start of the headings.
-        This cell should never be used. It's just to make the columns fit nicely."""
-        zero_heading = next(self.iter_column_headings())
-        zero_heading.config(state='disabled')
-        zero_heading.grid(row=0, column=0, sticky='nsew')
-        self.column_headings.pop()
+        if self.last_cell_ind is not None:
+            itemconfigure(self.cell_rects[self.last_cell_ind], fill='white')
+        self.last_cell_ind = None
 
-        for x in range(21):  # Max columns should be 20. Update this value if that changes
-            self.column_heading_frame.grid_columnconfigure(x, weight=1)
-            self.frame.columnconfigure(x, weight=1)
+        extra_items = self.cell_rects[20:] + self.cell_texts[20:]
+        if extra_items:
+            self.canvas.delete(*extra_items)
+        del self.cell_rects[20:], self.cell_texts[20:], self.cell_values[20:]
+        self.tape_length = len(self.cell_values)
 
-    def reset(self):
-        for widget in self.cells + self.row_headings + self.column_headings:
-            widget.destroy()
-        self.cells = []
-        self.row_headings = []
-        self.column_headings = []
+        for i, value in enumerate(self.cell_values):
+            if value != 0:
+                itemconfigure(self.cell_texts[i], text=0)
+                self.cell_values[i] = 0
 
-        for _ in range(20):
+        while self.tape_length < 20:
             self.add_cell()
 
-        self.last_tape_length = 0
-        self.last_rows = 0
-        self.last_columns = 0
-        self.last_cell_ind = 0
-        self.resize_canvas()
+        # The remaining cells are already in place, so this only drops the
+        # row headings that are no longer needed
+        self.init_tape()
 
-        self.canvas.yview_moveto(0)
+    def schedule_init_tape(self):
+        """Lay out the tape shortly, once resizing has settled. Any further calls
+        before then are merged into the same layout."""
+        if self.init_tape_after is not None:
+            return
+        self.init_tape_after = self.after(40, self.scheduled_init_tape)
+
+    def scheduled_init_tape(self):
+        self.init_tape_after = None
+        self.init_tape()
 
     def init_tape(self):
         width = self.canvas.winfo_width()
-        for columns in (20, 10, 5):
-            if width / (columns + 1) > 35:
-                break
+        if width == self.last_width and self.last_columns:
+            # The number of columns only depends on the width
+            columns = self.last_columns
         else:
-            columns = width // 35
-            if columns == 0:
-                return
+            for columns in (20, 10, 5):
+                if width / (columns + 1) > 35:
+                    break
+            else:
+                columns = width // 35
+                if columns == 0:
+                    return
 
         # Don't have an empty extra row at the end if self.tape_length
         # if divided by columns perfectly
@@ -215,130 +249,147 @@ class TapeFrame(ResizeFrame):
             (1 if self.tape_length % columns else 0)
 
         # Don't update if things were the same as last time
-        if self.last_tape_length == self.tape_length and self.last_rows == rows and self.last_columns == columns:
+        if self.last_tape_length == self.tape_length and self.last_rows == rows \
+                and self.last_columns == columns and self.last_width == width:
             return
 
-        # Don't update headings if they are the same as the previous ones
-        if not (self.last_columns == columns and self.last_rows == rows):
-            self.create_all_headings(rows, columns)
+        cell_width = width / (columns + 1)
+        relayout = self.last_columns != columns
+
+        # If only the width changed, every cell keeps its row and column so the
+        # existing items just need stretching to the new width
+        if not relayout and self.last_width != width:
+            scale = width / self.last_width
+            self.canvas.scale('all', 0, 0, scale, 1)
+            self.heading_canvas.scale('all', 0, 0, scale, 1)
+
+        self.create_all_headings(rows, columns, cell_width, relayout)
 
-        # We don't need to replace earlier cells if the positions of them haven't changed
-        start = 0 if self.tape_length == self.last_tape_length else self.last_tape_length
-        self.place_cells(columns, start)
+        # We don't need to move earlier cells if their rows and columns haven't changed
+        start = 0 if relayout else self.last_tape_length
+        self.place_cells(columns, cell_width, start)
 
         self.last_tape_length = self.tape_length
         self.last_rows = rows
         self.last_columns = columns
+        self.last_width = width
 
-    def place_cells(self, columns, start=0):
-        for i in range(start, len(self.cells)):
-            row, column = divmod(i, columns)
-            self.place_cell(self.cells[i], row, column)
-
-    def place_cell(self, cell, row, column):
-        cell.grid(row=row, column=column + 1, sticky='nsew')
-
-    def create_all_headings(self, rows, columns):
-        column_headings = self.iter_column_headings()
-        for x, heading in zip(range(columns), column_headings):
-            heading.grid(row=0, column=x + 1, sticky='nsew')
-            heading.config(state='normal')
-            heading.delete(0, 'end')
-            heading.insert(0, x)
-            heading.config(state='disabled')
-        for heading in self.column_headings[x + 1:]:
-            heading.grid_forget()
-
-        row_headings = self.iter_row_headings()
-        for y, heading in zip(range(rows), row_headings):
-            heading.grid(row=y, column=0, sticky='nesw')
-            heading.config(state='normal')
-            heading.delete(0, 'end')
-            heading.insert(0, y * columns)
-            heading.config(state='disabled')
-        for heading in self.row_headings[y + 1:]:
-            heading.grid_forget()
-
-    def resize_canvas(self):
-        self.init_tape()
-        self.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.canvas.itemconfig(
-            self.canvas_frame, width=self.canvas.winfo_width())
-
-    def set_cell(self, cell_ind, value, to_update=True):
-        try:
-            cell = self.cells[cell_ind]
-        except IndexError:
-            cell = self.add_cell()
-            if to_update:
-                self.resize_canvas()
-
-        last_cell = self.cells[self.last_cell_ind]
+        self.canvas.configure(scrollregion=(0, 0, width, rows * CELL_HEIGHT))
 
-        last_cell.config(disabledbackground='white')
-
-        cell.config(state='normal')
-        cell.delete(0, 'end')
-        cell.insert(0, value)
-        cell.config(state='disabled', disabledbackground='red')
+    def place_cells(self, columns, cell_width, start=0):
+        coords = self.canvas.coords
+        for i in range(start, self.tape_length):
+            row, column = divmod(i, columns)
+            x = (column + 1) * cell_width
+            y = row * CELL_HEIGHT
+            coords(self.cell_rects[i], x, y, x + cell_width, y + CELL_HEIGHT)
+            coords(self.cell_texts[i], x + cell_width / 2, y + CELL_HEIGHT / 2)
+
+    def create_all_headings(self, rows, columns, cell_width, relayout=True):
+        """Draw the column headings and the row headings. If `relayout` is False,
+        only the row headings that have been added or removed are redrawn."""
+        if relayout:
+            self.heading_canvas.delete('all')
+            self.canvas.delete('heading')
+            self.row_headings = []
+
+            # The first column heading is left empty to sit above the row headings
+            for x in range(columns + 1):
+                self.create_heading(self.heading_canvas, x * cell_width, 0,
+                                    cell_width, x - 1 if x else '')
+
+        while len(self.row_headings) < rows:
+            y = len(self.row_headings)
+            self.row_headings.append(self.create_heading(
+                self.canvas, 0, y * CELL_HEIGHT, cell_width, y * columns))
+        while len(self.row_headings) > rows:
+            self.canvas.delete(*self.row_headings.pop())
+
+    def create_heading(self, canvas, x, y, width, text):
+        """Draw a heading on `canvas` and return the ids of its rectangle and text."""
+        rect = canvas.create_rectangle(x, y, x + width, y + CELL_HEIGHT,
+                                       fill='grey', tags='heading')
+        text = canvas.create_text(x + width / 2, y + CELL_HEIGHT / 2,
+                                  text=text, tags='heading')
+        return rect, text
+
+    def set_cell(self, cell_ind, value):
+        self.is_reset = False
+        if cell_ind >= self.tape_length:
+            while cell_ind >= self.tape_length:
+                self.add_cell()
+            self.init_tape()
+
+        itemconfigure = self.canvas.itemconfigure
+
+        # Runs of + and - stay on the same cell, so only the value changes
+        if cell_ind != self.last_cell_ind:
+            if self.last_cell_ind is not None:
+                itemconfigure(self.cell_rects[self.last_cell_ind], fill='white')
+            itemconfigure(self.cell_rects[cell_ind], fill='red')
+
+        if self.cell_values[cell_ind] != value:
+            itemconfigure(self.cell_texts[cell_ind], text=value)
+            self.cell_values[cell_ind] = value
 
         self.last_cell_ind = cell_ind
 
-        if to_update:
-            self.scroll_to_current()
+        self.schedule_scroll_to_current()
 
     def add_cell(self):
-        cell = tk.Entry(self.frame)
-        cell.insert(0, 0)
-        cell.config(state='disabled', disabledbackground='white',
-                    disabledforeground='black')
-        self.cells.append(cell)
-        return cell
+        """Add a cell containing 0 to the end of the tape. It is positioned by `init_tape`."""
+        self.cell_rects.append(
+            self.canvas.create_rectangle(0, 0, 0, 0, fill='white'))
+        self.cell_texts.append(self.canvas.create_text(0, 0, text=0))
+        self.cell_values.append(0)
+        self.tape_length += 1
 
     def update_cells(self, cell_vals):
-        for i, val in enumerate(cell_vals):
-            self.set_cell(i, val, False)
-        self.resize_canvas()
+        """Make the cells display `cell_vals`. Only the cells whose value has
+        changed are redrawn."""
+        self.is_reset = False
+        while len(cell_vals) > self.tape_length:
+            self.add_cell()
+
+        itemconfigure = self.canvas.itemconfigure
+        cell_texts = self.cell_texts
+        cell_values = self.cell_values
+        # Find the cells that changed without a python level loop over every cell
+        changed = itertools.compress(
+            range(len(cell_vals)), map(operator.ne, cell_vals, cell_values))
+        for i in changed:
+            val = cell_vals[i]
+            itemconfigure(cell_texts[i], text=val)
+            cell_values[i] = val
+
+        # Resizes lay the tape out by themselves, so only a longer tape needs it here
+        if self.tape_length != self.last_tape_length:
+            self.init_tape()
+
+    def schedule_scroll_to_current(self):
+        """Scroll to the current cell once Tk is idle. Any further calls
+        before then are merged into the same scroll."""
+        if self.scroll_pending:
+            return
+        self.scroll_pending = True
+        self.after_idle(self.scroll_to_current)
 
     def scroll_to_current(self):
+        self.scroll_pending = False
+        # Nothing to scroll to before a cell is highlighted or the tape is laid out
+        if self.last_cell_ind is None or not self.last_rows:
+            return
         cell_row = self.last_cell_ind // self.last_columns
         offset = cell_row / self.last_rows
         y_top, y_bottom = self.canvas.yview()
         view_height = y_bottom - y_top
-        rows_encompassed = self.last_rows * view_height
-        row_height = view_height / rows_encompassed
+        row_height = 1 / self.last_rows
 
         if offset < y_top:
             self.canvas.yview_moveto(offset)
         elif offset + row_height > y_bottom:
             self.canvas.yview_moveto(offset - view_height + row_height)
 
-    def iter_column_headings(self):
-        for heading in self.column_headings:
-            yield heading
-        while True:
-            heading = tk.Entry(self.column_heading_frame)
-            heading.config(disabledbackground='grey',
-                           disabledforeground='black')
-            self.column_headings.append(heading)
-            yield heading
-
-    def iter_row_headings(self):
-        for heading in self.row_headings:
-            yield heading
-        while True:
-            heading = tk.Entry(self.frame)
-            heading.config(disabledbackground='grey',
-                           disabledforeground='black')
-            self.row_headings.append(heading)
-            yield heading
-
-    @property
-    def tape_length(self):
-        """Total number of cells."""
-        return len(self.cells)
-
 
 class CommandsFrame(ResizeFrame):
     """Frame containing interpreter commands: run, step, stop, pause, back, jump.
@@ -350,7 +401,9 @@ class CommandsFrame(ResizeFrame):
         self.max_jump = max_jump
         self.create_widgets()
 
-        self.bind('<Configure>', lambda x: self.configure_buttons())
+        self.configure_pending = False
+        self.last_width = None
+        self.bind('<Configure>', lambda x: self.schedule_configure_buttons())
         self.current_after = None
 
     def create_widgets(self):
@@ -504,8 +557,24 @@ class CommandsFrame(ResizeFrame):
     def grid_button(self, button, row, column):
         button.grid(row=row, column=column, sticky='nswe', padx=2)
 
+    def schedule_configure_buttons(self):
+        """Configure the buttons once Tk is idle. Any further calls
+        before then are merged into the same configure."""
+        if self.configure_pending:
+            return
+        self.configure_pending = True
+        self.after_idle(self.configure_buttons)
+
     def configure_buttons(self):
-        minsize = self.winfo_width() * .85 / 4
+        self.configure_pending = False
+
+        # <Configure> is also generated for changes that don't affect the buttons
+        width = self.winfo_width()
+        if width == self.last_width:
+            return
+        self.last_width = width
+
+        minsize = width * .85 / 4
         for i in range(4):
             self.buttons_frame.columnconfigure(i, weight=1, minsize=minsize)
 
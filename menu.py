@@ -16,6 +16,7 @@ class MenuBar(tk.Menu):
         self.file_types = (('Brainfuck (*.b)', '*.b'), ('All Files', '*.*'))
         self.current_filename = ''
         self.modified = False
+        self.window_title = None
 
     def create_menus(self):
         """4 buttons: New, Open, Save, Save As."""
@@ -68,8 +69,10 @@ class MenuBar(tk.Menu):
         if not filename:
             return
 
-        read = self._read_file(filename)
-        self.active_frame.load_program_text(read)
+        # Open the file before loading so that if it can't be opened,
+        # the current program is left untouched
+        with open(filename, 'r', encoding='utf-8', errors='surrogateescape') as file:
+            self.active_frame.load_program_text(self._read_file(file))
         self.current_filename = filename
         self._rename_window()
 
@@ -93,24 +96,23 @@ class MenuBar(tk.Menu):
         self.current_filename = filename
         self._rename_window()
 
-    def _read_file(self, filename):
-        """Read `filename` and return the contents."""
-        with open(filename, 'r') as file:
-            read = file.read()
-        return read
+    def _read_file(self, file, chunk_size=65536):
+        """Read the open `file` and yield the contents in chunks of `chunk_size` characters."""
+        yield from iter(lambda: file.read(chunk_size), '')
 
     def _write_file(self, filename):
         """Get the program text and write that to `filename`."""
-        program_text = self.active_frame.get_program_text()
-        with open(filename, 'w') as file:
-            file.write(program_text)
+        with open(filename, 'w', encoding='utf-8', errors='surrogateescape') as file:
+            file.writelines(self.active_frame.iter_program_text())
 
     def _rename_window(self):
         """Rename the root window based on the current file."""
         filename = f'{os.path.basename(self.current_filename)} - BF' if self.current_filename else 'BF'
         modified = f'{"* " if self.modified else ""}'
         title = f'{modified}{filename}'
-        self.master.wm_title(title)
+        if title != self.window_title:
+            self.window_title = title
+            self.master.wm_title(title)
 
     def set_modified(self, value):
         """If self.modified != value, then set it to `value` and rename the window."""
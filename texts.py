@@ -1,3 +1,4 @@
+import itertools
 import tkinter as tk
 
 
@@ -32,25 +33,30 @@ class InputText(tk.Text):
 
     def index_linecol(self, index):
         """Return the line and column of `index` as integers."""
-        return tuple(map(int, self.index(index).split('.')))
+        line, _, col = self.index(index).partition('.')
+        return int(line), int(col)
 
     def index_line(self, index):
         """Return the line of `index` as an integer."""
-        return int(self.index(index).split('.')[0])
+        return int(self.index(index).partition('.')[0])
 
     def index_col(self, index):
-        """Return the line of `index` as an integer."""
-        return int(self.index(index).split('.')[1])
+        """Return the column of `index` as an integer."""
+        return int(self.index(index).partition('.')[2])
 
 
 class TagText(InputText):
     """Automatically tags everything using `tag_func`. `tag_func` must return a 1d iterable
-    of char - tag pairs that can be unpacked into a suitable argument for tk.Text.insert"""
+    of char - tag pairs that can be unpacked into a suitable argument for tk.Text.insert
+
+    Generates a <<Change>> event whenever the text is edited or the view is scrolled."""
 
     def __init__(self, *args, tag_func, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.tag_func = tag_func
+        # Tagged output of single chars, which is what typing inserts
+        self.char_tags = {}
 
         self._commands_dict = {
             'insert': self._insert
@@ -60,6 +66,23 @@ class TagText(InputText):
         self.tk.call('rename', self._w, self._orig)
         self.tk.createcommand(self._w, self._proxy)
 
+    def move_tag(self, tagname, old_index, new_index):
+        """Move `tagname` from the character at `old_index` to the character at
+        `new_index`. Either index may be None. Tagging doesn't need the proxy, so this
+        calls the original widget command directly."""
+        if old_index is not None:
+            self.tk.call(self._orig, 'tag', 'remove', tagname, old_index)
+        if new_index is not None:
+            self.tk.call(self._orig, 'tag', 'add', tagname, new_index)
+
+    def remove_tag_chars(self, tagname, indices):
+        """Remove `tagname` from the character at every index in `indices` in one call.
+        tkinter's tag_remove only passes on a single range, so this calls the original
+        widget command directly."""
+        ranges = itertools.chain.from_iterable(
+            (index, f'{index}+1c') for index in indices)
+        self.tk.call(self._orig, 'tag', 'remove', tagname, *ranges)
+
     def _proxy(self, command, *args):
         try:
             result = self._commands_dict.get(
@@ -67,6 +90,10 @@ class TagText(InputText):
         except tk.TclError:
             return None
 
+        if command in ('insert', 'delete', 'replace', 'edit', 'see') \
+                or (command == 'yview' and args):
+            self.event_generate('<<Change>>', when='tail')
+
         return result
 
     def _insert(self, name, command, index, *args):
@@ -75,5 +102,13 @@ class TagText(InputText):
                 'Tagging for adding more than once thing is not yet supported.'
                 f'Arguments length was: {len(args)}, args: {args}')
 
-        result = self.tk.call(name, command, index, *self.tag_func(args[0]))
+        chars = args[0]
+        if len(chars) == 1:
+            tagged = self.char_tags.get(chars)
+            if tagged is None:
+                tagged = self.char_tags[chars] = tuple(self.tag_func(chars))
+        else:
+            tagged = self.tag_func(chars)
+
+        result = self.tk.call(name, command, index, *tagged)
         return result
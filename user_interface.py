@@ -1,9 +1,8 @@
-import codecs
-from collections import deque
 import functools
 import itertools
 import re
 import string
+import time
 import tkinter as tk
 
 from interpreter import (BFInterpreter,
@@ -16,12 +15,41 @@ from interpreter import (BFInterpreter,
 from main_frames import CodeFrame, TapeFrame, CommandsFrame
 
 
-ASCII_PRINTABLE = set(string.printable)
+ASCII_PRINTABLE = frozenset(string.printable)
+BF_COMMANDS = frozenset('[]<>+-,.')
 CHARS_TO_ESCAPE = {
     '\n': r'\n',
     '\t': r'\t',
     '\r': r'\r'
 }
+ESCAPE_TABLE = str.maketrans(CHARS_TO_ESCAPE)
+ESCAPE_SEQUENCES = {
+    r'\n': '\n',
+    r'\t': '\t',
+    r'\r': '\r',
+    '\\\\': '\\'
+}
+# Matches either an escape sequence or a single character of input
+INPUT_PATTERN = re.compile(r'\\(?:n|r|t|\\|\d{1,3})|.')
+INPUT_MAX_LENGTH = 4
+ERROR_MESSAGES = {
+    ErrorTypes.UNMATCHED_OPEN_PAREN: 'Unmatched opening parentheses',
+    ErrorTypes.UNMATCHED_CLOSE_PAREN: 'Unmatched closing parentheses',
+    ErrorTypes.INVALID_TAPE_CELL: 'Tape pointer out of bounds'
+}
+# Indexed by the value of the speed scale (1 - 100) minus 1
+RUNSPEEDS = tuple(int(1000 / (speed * speed * .0098 + 1)) for speed in range(1, 101))
+FAST_STEPS_SKIP = tuple((speed - 1) // 5 for speed in range(1, 101))
+# Matches runs of characters that have the same tag. The group name is the tag
+CODE_TAG_PATTERN = re.compile(
+    r'(?P<loop>[][]+)|(?P<pointer>[<>]+)|(?P<cell>[-+]+)|(?P<io>[,.]+)|(?P<comment>[^][<>+,.-]+)')
+CODE_TAG_COLOURS = (
+    ('comment', 'grey'),
+    ('loop', 'red'),
+    ('io', 'blue'),
+    ('pointer', 'purple'),
+    ('cell', 'green')
+)
 
 
 class Brainfuck(tk.Frame):
@@ -31,7 +59,11 @@ class Brainfuck(tk.Frame):
         """Create all widgets. Reset everything."""
         super().__init__(master)
 
-        self.code_tags_to_remove = []
+        self.last_highlight_index = None
+        self.highlighted_input_span = (0, 0)
+        self.error_indices = []
+        self.running_batch = False
+        self.run_after = None
 
         self.pack(fill='both', expand=True)
         self.create_widgets()
@@ -53,22 +85,10 @@ class Brainfuck(tk.Frame):
                               speed etc. Also where input / output is."""
 
         # Create code text frame
-        self.command_highlights = {
-            '[': 'loop',
-            ']': 'loop',
-            '>': 'pointer',
-            '<': 'pointer',
-            '+': 'cell',
-            '-': 'cell',
-            ',': 'io',
-            '.': 'io'
-        }
-
         # Function for create the correct tag for chars
         def tag_func(chars):
-            groups = itertools.groupby(
-                chars, key=lambda x: self.command_highlights.get(x, 'comment'))
-            return itertools.chain.from_iterable((''.join(group), key) for key, group in groups)
+            return itertools.chain.from_iterable(
+                (match[0], match.lastgroup) for match in CODE_TAG_PATTERN.finditer(chars))
 
         self.code_text_frame = CodeFrame(self, .02, .1, .5, .88,
                                          text_kwargs={
@@ -81,7 +101,7 @@ class Brainfuck(tk.Frame):
         self.code_text.bind('<Key>', self.code_text_input)
         self.code_text.bind('<Button-3>', self.set_breakpoint)  # rmb
         self.code_text.bind('<<Modified>>', self.code_text_modified)
-        for tag, colour in ('comment', 'grey'), ('loop', 'red'), ('io', 'blue'), ('pointer', 'purple'), ('cell', 'green'):
+        for tag, colour in CODE_TAG_COLOURS:
             self.code_text.tag_configure(tag, foreground=colour)
 
         # Create tape frame
@@ -101,6 +121,9 @@ class Brainfuck(tk.Frame):
         a new `self.interpreter`. Program text is gotten again. Return True if
         initislising new interpreter was successful else False."""
         self.reset_all()
+        # Nothing has been executed yet, so nothing is highlighted if a batch runs
+        # no instructions
+        self.code_pointer = -1
 
         self.parse_code_text()
         try:
@@ -118,14 +141,8 @@ class Brainfuck(tk.Frame):
     def handle_interpreter_error(self, error):
         """Handle error from interpreter. May be a syntax error or runtime error.
         These errors do not include missing input."""
-        error_type = error.error
-        if error_type is ErrorTypes.UNMATCHED_OPEN_PAREN:
-            message = 'Unmatched opening parentheses'
-        elif error_type is ErrorTypes.UNMATCHED_CLOSE_PAREN:
-            message = 'Unmatched closing parentheses'
-        elif error_type is ErrorTypes.INVALID_TAPE_CELL:
-            message = 'Tape pointer out of bounds'
-        else:
+        message = ERROR_MESSAGES.get(error.error)
+        if message is None:
             raise error
 
         if error.location is not None:
@@ -136,7 +153,8 @@ class Brainfuck(tk.Frame):
             self.commands_frame.display_error_text(full_message)
             self.code_text.tag_add('error', location)
             self.code_text.see(location)
-            self.code_tags_to_remove.append(('error', location))
+            if location not in self.error_indices:
+                self.error_indices.append(location)
         else:
             self.commands_frame.display_error_text(message)
 
@@ -144,16 +162,16 @@ class Brainfuck(tk.Frame):
         """Reset output text, previous interpreter settings and instruction count.
         Doesn't reset code text."""
         self.reset_output()
-        self.reset_past_input_spans()
+        self.reset_input_ends()
         self.reset_hightlights()
         self.tape_frame.reset()
         self.commands_frame.update_instruction_counter(0)
-        self.run_code = False
+        self.cancel_run()
 
-    def step(self, display=True):
-        """Step one instruction. If execution has ended, then commands are paused.
-        Change will be displayed if `display` is True. Return True if an
-        instruction was executed successfully and there is no reason to stop else False."""
+    def step(self):
+        """Step one instruction and display the change. If execution has ended, then
+        commands are paused. Return True if an instruction was executed successfully
+        and there is no reason to stop else False."""
         if not self.interpreter:
             successful = self.init_interpreter()
             # Return False if not successful in creating new interpreter
@@ -162,23 +180,11 @@ class Brainfuck(tk.Frame):
 
         try:
             self.code_pointer = self.interpreter.step()
-        except ExecutionEndedError:
-            # Execution has finised
-            self.commands_frame.pause_command()
-            self.commands_frame.display_error_text('Execution finished')
-            return False
-        except NoInputError:
-            # No input was given (from `self.input_func`)
-            self.commands_frame.pause_command()
-            self.commands_frame.display_error_text('Enter input')
-            return False
-        except ProgramRuntimeError as error:
-            self.commands_frame.pause_command()
-            self.handle_interpreter_error(error)
+        except (ExecutionEndedError, NoInputError, ProgramRuntimeError) as error:
+            self.handle_step_error(error)
             return False
 
-        if display:
-            self.configure_current()
+        self.configure_current()
 
         if self.code_pointer in self.breakpoints:
             self.commands_frame.pause_command()
@@ -186,6 +192,20 @@ class Brainfuck(tk.Frame):
 
         return True
 
+    def handle_step_error(self, error):
+        """Pause execution and display the reason that stepping stopped."""
+        self.commands_frame.pause_command()
+        if isinstance(error, ExecutionEndedError):
+            # Execution has finised
+            self.commands_frame.display_error_text('Execution finished')
+        elif isinstance(error, NoInputError):
+            # No input was given (from `self.input_func`)
+            self.commands_frame.display_error_text('Enter input')
+        elif isinstance(error, NoPreviousExecutionError):
+            self.commands_frame.display_error_text('No previous execution')
+        else:
+            self.handle_interpreter_error(error)
+
     def run(self):
         """Run instructions until execution is paused or execution has ended."""
         if not self.interpreter:
@@ -194,35 +214,58 @@ class Brainfuck(tk.Frame):
             if not successful:
                 return
         self.run_code = True
+        self.last_run_time = None
         self.run_steps()
 
     def run_steps(self):
         """`self.step` every `self.runspeed` ms until `self.runcode` is False.
         Step `self.steps_skip` more times if it is non-zero."""
+        self.run_after = None
         if not self.run_code:
             return
 
-        for _ in range(self.steps_skip + 1):
-            if not self.step():
+        now = time.perf_counter()
+        if self.steps_skip:
+            # Scale the batch by how long it has actually been since the last one, so
+            # that the speed doesn't drop when Tk runs late because displaying was slow
+            steps = self.steps_skip + 1
+            if self.last_run_time is not None:
+                elapsed = min(now - self.last_run_time, .1) * 1000
+                steps = max(1, round(steps * elapsed / self.runspeed))
+            self.last_run_time = now
+
+            # Run the whole batch in the interpreter and only display where it ended up
+            code_pointer, error = self.run_interpreter(self.interpreter.step_n, steps)
+            if not self.display_steps(code_pointer, error):
                 return
+        elif not self.step():
+            return
 
-        # step again after `self.runspeed` ms
-        self.after(self.runspeed, self.run_steps)
+        # step again `self.runspeed` ms after this step started
+        elapsed = (time.perf_counter() - now) * 1000
+        self.run_after = self.after(
+            max(1, round(self.runspeed - elapsed)), self.run_steps)
 
     def stop(self):
         """Stop execution. Reset `self.interpreter`."""
         self.interpreter = None
-        self.run_code = False
+        self.cancel_run()
         self.reset_hightlights()
         self.tape_frame.reset()
 
     def pause(self):
         """Pause execution."""
+        self.cancel_run()
+
+    def cancel_run(self):
+        """Stop running and cancel the next scheduled `self.run_steps` if there is one."""
         self.run_code = False
+        if self.run_after is not None:
+            self.after_cancel(self.run_after)
+            self.run_after = None
 
-    def back(self, display=True):
-        """Step one instruction backwards.
-        Change will be displayed if `display` is True. Return True if
+    def back(self):
+        """Step one instruction backwards and display the change. Return True if
         stepping backwards was successful else False (no previous execution)."""
 
         if not self.interpreter:
@@ -232,15 +275,10 @@ class Brainfuck(tk.Frame):
             self.commands_frame.display_error_text('No previous execution')
             return False
 
-        # Rollback input if the current command is to take input
-        if self.interpreter.current_instruction == ',':
-            self.highlight_input(self.past_input_spans.pop(),
-                                 self.past_input_spans[-1])
-
         self.code_pointer = self.interpreter.back()
+        self.sync_input_ends()
 
-        if display:
-            self.configure_current()
+        self.configure_current()
 
         if self.code_pointer in self.breakpoints:
             self.commands_frame.pause_command()
@@ -250,15 +288,56 @@ class Brainfuck(tk.Frame):
 
     def jump(self, steps):
         """Jump `steps` number of steps forwards if `steps` is positive else backwards."""
-        method = self.step if steps > 0 else self.back
+        if steps > 0:
+            if not self.interpreter and not self.init_interpreter():
+                return
+            code_pointer, error = self.run_interpreter(
+                self.interpreter.step_n, steps)
+        else:
+            if not self.interpreter:
+                return
+            code_pointer, error = self.run_interpreter(
+                self.interpreter.back_n, -steps)
 
-        for _ in range(abs(steps)):
-            if not method(False):
-                break
+        self.display_steps(code_pointer, error)
 
-        if self.interpreter:
-            self.tape_frame.update_cells(self.interpreter.tape)
-            self.configure_current()
+    def run_interpreter(self, method, steps):
+        """Call `method` (`step_n` or `back_n` of `self.interpreter`) with `steps` and
+        `self.breakpoints` and return the result. Output and the input highlighting
+        aren't displayed while it runs."""
+        self.interpreter.output_func = None
+        self.running_batch = True
+        try:
+            return method(steps, self.breakpoints)
+        finally:
+            self.interpreter.output_func = self.configure_output
+            self.running_batch = False
+            self.sync_input_ends()
+
+    def display_steps(self, code_pointer, error):
+        """Display the state after several steps were made without displaying anything.
+        `code_pointer` and `error` are as returned by `step_n` / `back_n`. Return True
+        if there is no reason to stop stepping else False."""
+        if code_pointer is not None:
+            self.code_pointer = code_pointer
+
+        self.configure_output(self.interpreter.output)
+        self.tape_frame.update_cells(self.interpreter.tape)
+        self.configure_current()
+
+        if error is not None:
+            self.handle_step_error(error)
+            return False
+        if code_pointer in self.breakpoints:
+            self.commands_frame.pause_command()
+            return False
+        return True
+
+    def sync_input_ends(self):
+        """Discard the ends of any input that has been stepped back over. Then
+        move the input highlighting to the last input if it moved."""
+        del self.input_ends[self.interpreter.input_count + 1:]
+        self.highlight_input()
 
     def configure_current(self):
         """Configures all the necessary output after a command."""
@@ -268,19 +347,32 @@ class Brainfuck(tk.Frame):
             self.interpreter.instruction_count)
 
     def hightlight_text(self):
-        """Remove the hightlighting from the previous command and add the new highlighting."""
-        self.remove_code_tags()
-        if self.code_pointer >= 0:
-            index = self.pointer_to_index[self.code_pointer]
-            self.code_text.tag_add('highlight', index)
-            # Scroll to current command if it is offscreen
-            self.code_text.see(index)
-            self.code_tags_to_remove.append(('highlight', index))
+        """Move the hightlighting from the previous command to the current command.
+        Also remove any error tags."""
+        if self.error_indices:
+            self.remove_error_tags()
+        code_pointer = self.code_pointer
+        index = self.pointer_to_index[code_pointer] if code_pointer >= 0 else None
+        code_text = self.code_text
+        code_text.move_tag('highlight', self.last_highlight_index, index)
+        self.last_highlight_index = index
+        # Scroll to current command if it is offscreen. `see` makes
+        # `self.code_text` generate a <<Change>> event, so avoid it if possible
+        if index is not None and code_text.bbox(index) is None:
+            code_text.see(index)
 
     def remove_code_tags(self):
-        """Remove all tags in `self.code_tags_to_remove` from `self.code_text`."""
-        while self.code_tags_to_remove:
-            self.code_text.tag_remove(*self.code_tags_to_remove.pop())
+        """Remove the current highlight and any error tags from `self.code_text`."""
+        if self.last_highlight_index is not None:
+            self.code_text.move_tag('highlight', self.last_highlight_index, None)
+            self.last_highlight_index = None
+        self.remove_error_tags()
+
+    def remove_error_tags(self):
+        """Remove all the error tags from `self.code_text`."""
+        if self.error_indices:
+            self.code_text.remove_tag_chars('error', self.error_indices)
+            self.error_indices.clear()
 
     def highlight_cell(self):
         """Highlight the current cell that `self.interpreter.tape_pointer`
@@ -292,21 +384,25 @@ class Brainfuck(tk.Frame):
         """Make sure the output is correct. If the current output is too short, add
         the missing characters to the end. If the current output is too long, delete
         the extra characters"""
-        current_output = self.output_text.get('1.0', 'end-1c')
+        # The length of the output being displayed is kept track of, so the
+        # displayed output never has to be fetched back from `self.output_text`
+        output_length = self.output_length
 
-        if len(output) > len(current_output):
+        if len(output) > output_length:
             self.output_text.configure(state='normal')
             self.output_text.insert(
-                'end', output[len(current_output):])
+                'end', ''.join(output[output_length:]))
             self.output_text.configure(state='disabled')
-        elif len(output) < len(current_output):
+        elif len(output) < output_length:
             self.output_text.configure(state='normal')
             self.output_text.delete(
-                f'end-{len(current_output) - len(output) + 1}c', 'end')
+                f'end-{output_length - len(output) + 1}c', 'end')
             self.output_text.configure(state='disabled')
+        self.output_length = len(output)
 
     def reset_output(self):
         """Delete all of the current output."""
+        self.output_length = 0
         self.output_text.configure(state='normal')
         self.output_text.delete('1.0', 'end')
         self.output_text.configure(state='disabled')
@@ -314,28 +410,34 @@ class Brainfuck(tk.Frame):
     def set_runspeed(self, *args):
         """Set `self.runspeed` to the current speed to run at (ms between each step).
         Called if `self.speed_scale` or `self.fast_mode` was changed."""
-        speed_scale = self.speed_scale.get()
+        speed_index = self.speed_scale.get() - 1
         fast_mode = self.fast_mode.get()
-        # runspeed = (110 - speed_scale) // 10 if fast_mode \
-        #     else int(1000 / (speed_scale * speed_scale * .0098 + 1))
         if fast_mode:
             self.runspeed = 10
-            self.steps_skip = (speed_scale - 1) // 5
+            self.steps_skip = FAST_STEPS_SKIP[speed_index]
         else:
-            self.runspeed = int(1000 / (speed_scale * speed_scale * .0098 + 1))
+            self.runspeed = RUNSPEEDS[speed_index]
             self.steps_skip = 0
 
     def get_program_text(self):
         """Return the current program text."""
         return self.code_text.get('1.0', 'end-1c')
 
+    def iter_program_text(self, lines=1000):
+        """Yield the current program text in chunks of `lines` lines."""
+        last_line = self.code_text.index_line('end-1c')
+        for line in range(1, last_line + 1, lines):
+            end = f'{line + lines}.0' if line + lines <= last_line else 'end-1c'
+            yield self.code_text.get(f'{line}.0', end)
+
     def get_next_input_char(self):
         """Return the next character in the input. If there is no next input, return `None`."""
-        last_end = self.past_input_spans[-1][1]
+        last_end = self.input_ends[-1]
 
-        # Get the next character of input starting from the end of the last character of input
-        match_obj = re.match(
-            r'^(\\(?:n|r|t|\\|\d{1,3})|.)', self.input_entry.get(last_end, 'end-1c'))
+        # Get the next character of input starting from the end of the last character
+        # of input. Only fetch as much as the longest possible escape sequence
+        match_obj = INPUT_PATTERN.match(
+            self.input_entry.get(f'1.{last_end}', f'1.{last_end + INPUT_MAX_LENGTH}'))
         if not match_obj:
             return None
         match = match_obj[0]
@@ -347,30 +449,31 @@ class Brainfuck(tk.Frame):
                 # Ascii code
                 match = chr(int(match[1:]))
             else:
-                # Escape character (\n, \r, \t)
-                match = codecs.decode(match, 'unicode_escape')
+                # Escape character (\n, \r, \t, \\)
+                match = ESCAPE_SEQUENCES[match]
 
-        new_input_span = (self.input_entry.index(f'{last_end}+{match_obj.start()}c'),
-                          self.input_entry.index(f'{last_end}+{match_obj.end()}c'))
-        self.past_input_spans.append(new_input_span)
+        self.input_ends.append(last_end + match_obj.end())
 
-        self.highlight_input()
+        # Batches highlight the input once they have finished instead
+        if not self.running_batch:
+            self.highlight_input()
 
         return match
 
-    def highlight_input(self, last_input_span=None, new_input_span=None):
-        """Remove the hightlighting from `last_input_span` and add
-        highlighting to `new_input_span`. As default, set `last_input_span`
-        and `new_input_span` to the 2nd last and last past input spans."""
-        if not last_input_span:
-            last_input_span = self.past_input_spans[-2]
-        if not new_input_span:
-            new_input_span = self.past_input_spans[-1]
+    def highlight_input(self):
+        """Move the input highlighting to the last input that was read, if it isn't
+        already there."""
+        last_input_span = self.highlighted_input_span
+        input_ends = self.input_ends
+        new_input_span = (input_ends[-2], input_ends[-1]) if len(input_ends) > 1 else (0, 0)
+        if new_input_span == last_input_span:
+            return
+        self.highlighted_input_span = new_input_span
         self.input_entry.tag_remove(
-            'highlight', last_input_span[0], last_input_span[1])
+            'highlight', f'1.{last_input_span[0]}', f'1.{last_input_span[1]}')
         self.input_entry.tag_add(
-            'highlight', new_input_span[0], new_input_span[1])
-        self.input_entry.see(new_input_span[1])
+            'highlight', f'1.{new_input_span[0]}', f'1.{new_input_span[1]}')
+        self.input_entry.see(f'1.{new_input_span[1]}')
 
     def input_entry_input(self, event):
         """Event called whenever a key is pressed in `self.input_entry`. Prevent
@@ -379,7 +482,7 @@ class Brainfuck(tk.Frame):
         if event.char in ASCII_PRINTABLE:
             if self.insert_entry_valid('insert'):
                 self.input_entry.delete_selected()
-                self.insert_entry_char(event.char)
+                self.insert_entry_text(event.char)
                 self.input_entry.see('insert')
             return 'break'
         elif event.keysym == 'BackSpace':
@@ -394,34 +497,32 @@ class Brainfuck(tk.Frame):
         return None
 
     def input_entry_paste(self, event):
-        """Insert each character in the clipboard one by one.  Prevent
+        """Insert the clipboard contents in one go. Prevent
         user from deleting input that has already been processed."""
         if self.insert_entry_valid('insert'):
             self.input_entry.delete_selected()
-            for char in self.input_entry.clipboard_get():
-                self.insert_entry_char(char)
+            self.insert_entry_text(self.input_entry.clipboard_get())
             self.input_entry.see('insert')
         return 'break'
 
-    def insert_entry_char(self, char):
-        """Insert `char`. Replaces whitespace characters with their escape characters. Eg. newline with \\n"""
-        self.input_entry.insert('insert', CHARS_TO_ESCAPE.get(char, char))
+    def insert_entry_text(self, text):
+        """Insert `text`. Replaces whitespace characters with their escape characters. Eg. newline with \\n"""
+        self.input_entry.insert('insert', text.translate(ESCAPE_TABLE))
 
     def insert_entry_valid(self, index):
         """Return whether it would be valid for a characted to be interted into `self.input_entry` at `index`.
         An insertion is only valid if that index hasn't yet been processed by the interpreter."""
         if not self.interpreter:
             return True
-        last_input = self.past_input_spans[-1][1]
+        last_input = self.input_ends[-1]
 
         if self.input_entry.within_selected():
             # If text is selected and the cursor is within the current selection,
             # then make the comparison index the start of the current selection
             index = self.input_entry.get_selected()[0]
 
-        if self.input_entry.compare(index, '<', last_input):
-            return False
-        return True
+        # Tk compares the indices itself, so the column of `index` isn't parsed out
+        return not self.input_entry.compare(index, '<', f'1.{last_input}')
 
     def code_text_input(self, *event):
         """When a key is pressed in `self.code_text`. If code is running, then disallow
@@ -432,7 +533,7 @@ class Brainfuck(tk.Frame):
         if self.interpreter:
             self.commands_frame.stop_command()
             self.reset_all()
-        if self.code_tags_to_remove:
+        if self.last_highlight_index is not None or self.error_indices:
             self.remove_code_tags()
             self.commands_frame.remove_error_text()
 
@@ -464,51 +565,84 @@ class Brainfuck(tk.Frame):
         index = self.code_text.index(f'@{event.x},{event.y}')
         char = self.code_text.get(index)
 
-        if char not in self.command_highlights:
+        if char not in BF_COMMANDS:
             return  # Breakpoints only allowed on command characters
 
         if 'breakpoint' in self.code_text.tag_names(index):
             self.code_text.tag_remove('breakpoint', index)
             if self.interpreter:
-                self.breakpoints.remove(self.index_to_pointer[index])
+                self.breakpoints.remove(self.index_to_pointer(index))
         else:
             self.code_text.tag_add('breakpoint', index)
             if self.interpreter:
-                self.breakpoints.add(self.index_to_pointer[index])
+                self.breakpoints.add(self.index_to_pointer(index))
+
+    def index_to_pointer(self, index):
+        """Return the pointer of the character at text index `index` ("line.col")."""
+        line, _, col = index.partition('.')
+        return self.line_offsets[int(line) - 1] + int(col)
 
-    def reset_past_input_spans(self):
-        """Reset `self.past_input_spans` to a `deque([('1.0', '1.0')])`."""
-        self.past_input_spans = deque([('1.0', '1.0')])
+    def reset_input_ends(self):
+        """Reset `self.input_ends`, the column offset into the (single line) input text
+        of the end of each input that has been read. Each input starts where the one
+        before it ended, so only the ends need storing."""
+        self.input_ends = [0]
 
     def reset_hightlights(self):
         """Removes all highlighting from `self.input_entry` and `self.code_text`."""
-        self.input_entry.tag_remove('highlight', '1.0', 'end')
+        # Only the last input read is ever highlighted, so only that range is cleared
+        start, end = self.highlighted_input_span
+        self.input_entry.tag_remove('highlight', f'1.{start}', f'1.{end}')
+        self.highlighted_input_span = (0, 0)
         self.remove_code_tags()
 
     def load_program_text(self, code):
-        """Writes `code` into `self.code_text`, overwriting everything."""
+        """Writes `code` into `self.code_text`, overwriting everything.
+        `code` can either be a string or an iterable of strings."""
         self.commands_frame.stop_command()
         self.reset_all()
-        self.code_text.delete('1.0', 'end')
-        self.code_text.edit_reset()
-        self.code_text.insert('1.0', code)
 
+        # Loading shouldn't be something that can be undone, so don't record it at all
+        undo = self.code_text.cget('undo')
+        self.code_text.configure(undo=False)
+        try:
+            self.code_text.delete('1.0', 'end')
+
+            if isinstance(code, str):
+                self.code_text.insert('1.0', code)
+            else:
+                for chunk in code:
+                    self.code_text.insert('end-1c', chunk)
+                    # Let the line numbers and window redraw between chunks
+                    self.update_idletasks()
+        finally:
+            self.code_text.configure(undo=undo)
+            self.code_text.edit_reset()
         self.code_text.edit_modified(False)
 
     def parse_code_text(self):
         """Need to think of a better name for this.
-        Creates dicts `self.pointer_to_index` and `self.index_to_poitner` of
-        all pointer to text index pairs and vice-vera. Also stores all breakpoints."""
-        self.pointer_to_index = {}
-        self.index_to_pointer = {}
-        self.breakpoints = set()
+        Creates list `self.pointer_to_index` of the text index of every pointer and
+        list `self.line_offsets` of the pointer at the start of every line. Also stores
+        all breakpoints."""
+        pointer_to_index = self.pointer_to_index = []
+        line_offsets = self.line_offsets = [0]
         text = self.get_program_text()
-        pointer = 0
-        index = '1.0'
-        for _ in text:
-            self.pointer_to_index[pointer] = index
-            self.index_to_pointer[index] = pointer
-            if 'breakpoint' in self.code_text.tag_names(index):
-                self.breakpoints.add(pointer)
-            pointer += 1
-            index = self.code_text.index(f'{index}+1c')
+        # Work out the text index of each character rather than asking Tk for it
+        line, col = 1, 0
+        for pointer, char in enumerate(text):
+            index = f'{line}.{col}'
+            pointer_to_index.append(index)
+            if char == '\n':
+                line += 1
+                col = 0
+                line_offsets.append(pointer + 1)
+            else:
+                col += 1
+
+        # Adjacent breakpoints are merged into a single range of the tag
+        breakpoints = self.breakpoints = set()
+        ranges = self.code_text.tag_ranges('breakpoint')
+        for start, end in zip(ranges[::2], ranges[1::2]):
+            breakpoints.update(range(self.index_to_pointer(str(start)),
+                                     self.index_to_pointer(str(end))))
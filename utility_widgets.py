@@ -1,30 +1,78 @@
 import tkinter as tk
 
+# Line numbers are redrawn at most this often (ms) so that bursts of scrolling
+# or typing only redraw once per frame
+REDRAW_DELAY = 16
+
 
 class TextLineNumbers(tk.Canvas):
-    """The line numbers for a text widget"""
+    """The line numbers for a text widget. `textwidget` must generate a <<Change>>
+    event whenever it is edited or scrolled (eg. `TagText`)."""
 
     def __init__(self, *args, textwidget=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.textwidget = textwidget
+        self.redraw_pending = False
+        self.last_view = None
+        # (item id, line number, y) of each line number currently drawn, top to bottom
+        self.line_items = []
+
+        self.textwidget.bind('<<Change>>', self.schedule_redraw, add=True)
+        self.textwidget.bind('<Configure>', self.schedule_redraw, add=True)
+        self.textwidget.bind('<Map>', self.force_redraw, add=True)
         self.redraw()
 
+    def schedule_redraw(self, *args):
+        """Redraw the line numbers after `REDRAW_DELAY` ms. Any further calls
+        before then are merged into the same redraw."""
+        if self.redraw_pending:
+            return
+        self.redraw_pending = True
+        self.after(REDRAW_DELAY, self.redraw)
+
+    def force_redraw(self, *args):
+        """Schedule a redraw even if the view looks the same as last time. Used when
+        `textwidget` is mapped again, since it can't be measured while it is unmapped."""
+        self.last_view = None
+        self.schedule_redraw()
+
     def redraw(self, *args):
         """redraw line numbers"""
-        self.delete('all')
-
-        i = self.textwidget.index('@0,0')
+        self.redraw_pending = False
+
+        # Nothing needs redrawing if the view, line count and size are unchanged
+        view = (self.textwidget.yview(), self.textwidget.index('end'),
+                self.textwidget.winfo_height())
+        if view == self.last_view:
+            return
+        self.last_view = view
+
+        # Reuse the items that are already drawn, only changing what is different
+        dlineinfo = self.textwidget.dlineinfo
+        line_items = self.line_items
+        linenum = int(self.textwidget.index('@0,0').partition('.')[0])
+        slot = 0
         while True:
-            dline = self.textwidget.dlineinfo(i)
+            dline = dlineinfo(f'{linenum}.0')
             if dline is None:
                 break
             y = dline[1]
-            linenum = str(i).split('.')[0]
-            self.create_text(2, y, anchor='nw', text=linenum)
-            i = self.textwidget.index(f'{i}+1line')
-
-        # Refreshes the canvas widget every 20ms
-        self.after(20, self.redraw)
+            if slot < len(line_items):
+                item, drawn_linenum, drawn_y = line_items[slot]
+                if drawn_y != y:
+                    self.coords(item, 2, y)
+                if drawn_linenum != linenum:
+                    self.itemconfigure(item, text=linenum)
+                line_items[slot] = (item, linenum, y)
+            else:
+                line_items.append(
+                    (self.create_text(2, y, anchor='nw', text=linenum), linenum, y))
+            slot += 1
+            linenum += 1
+
+        if slot < len(line_items):
+            self.delete(*(item for item, _, _ in line_items[slot:]))
+            del line_items[slot:]
 
 
 class ResizeFrame(tk.Frame):